@@ -6,14 +6,103 @@ This script can be called from Node.js to make predictions using trained models
 
 import sys
 import json
-import numpy as np
-import joblib
 import os
+import threading
 from pathlib import Path
 
+# orjson is optional; it is noticeably faster on numeric-heavy batch payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
+# Deserialized (file versions, model, scaler) entries keyed by model name
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# Opt-in float32 inference; tree ensembles cast their inputs to float32 internally anyway
+_FEATURE_DTYPE = 'float32' if os.environ.get('ML_PREDICT_FLOAT32', '').lower() in ('1', 'true', 'yes') else 'float64'
+
+def _cast_scaler(scaler):
+    """Down-cast the fitted scaler statistics to the inference dtype in place"""
+    for attr in ('mean_', 'scale_', 'var_'):
+        value = getattr(scaler, attr, None)
+        if value is not None:
+            setattr(scaler, attr, value.astype(_FEATURE_DTYPE))
+    return scaler
+
+def _scale_in_place(scaler, features_array):
+    """Apply a fitted StandardScaler in place; anything else goes through transform"""
+    import numpy as np
+    from sklearn.preprocessing import StandardScaler
+    
+    # Fall back to transform for subclasses (which may override it) and
+    # whenever sklearn's own validation would matter
+    if (type(scaler) is not StandardScaler
+            or getattr(scaler, 'n_features_in_', None) != features_array.shape[1]
+            or not np.isfinite(features_array).all()):
+        return scaler.transform(features_array)
+    
+    if scaler.with_mean:
+        np.subtract(features_array, scaler.mean_, out=features_array)
+    if scaler.with_std:
+        np.divide(features_array, scaler.scale_, out=features_array)
+    return features_array
+
+def _file_version(path):
+    """Modification time and size, used to detect a model file being rewritten"""
+    stats = path.stat()
+    return stats.st_mtime_ns, stats.st_size
+
+def _model_summary(model):
+    """Basic facts about a loaded model, as reported by get_model_info"""
+    return {
+        'type': type(model).__name__,
+        'has_feature_importance': hasattr(model, 'feature_importances_'),
+        'has_predict_proba': hasattr(model, 'predict_proba')
+    }
+
+def _summary_path(model_path):
+    """Sidecar JSON next to a model file holding its cached summary"""
+    return model_path.with_name(f"{model_path.stem}.info.json")
+
+def _write_model_summary(model_path, model, version):
+    """Persist the model summary so get_model_info can skip loading the model"""
+    try:
+        with open(_summary_path(model_path), 'w') as f:
+            json.dump({'version': list(version), 'summary': _model_summary(model)}, f)
+    except OSError:
+        pass
+
+def _read_model_summary(model_path):
+    """Read a sidecar summary if it was written for the current model file"""
+    try:
+        with open(_summary_path(model_path)) as f:
+            sidecar = json.load(f)
+        if tuple(sidecar['version']) != _file_version(model_path):
+            return None
+        return sidecar['summary']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
 def load_model(model_name='enhanced_astrological_model'):
-    """Load the trained model and scaler"""
+    """
+    Load the trained model and scaler, reusing cached copies when available.
+    Cached copies are reloaded when either file changes on disk, so a
+    long-running worker picks up retrained models.
+    """
     try:
+        import joblib
+        
         current_dir = Path(__file__).parent
         model_path = current_dir / f"{model_name}.pkl"
         scaler_path = current_dir / "enhanced_astrological_scaler.pkl"
@@ -24,10 +113,23 @@ def load_model(model_name='enhanced_astrological_model'):
         if not scaler_path.exists():
             raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
         
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
+        versions = (_file_version(model_path), _file_version(scaler_path))
+        cached = _MODEL_CACHE.get(model_name)
+        if cached is not None and cached[0] == versions:
+            return cached[1], cached[2]
         
-        return model, scaler
+        with _MODEL_CACHE_LOCK:
+            cached = _MODEL_CACHE.get(model_name)
+            if cached is None or cached[0] != versions:
+                model = joblib.load(model_path)
+                scaler = joblib.load(scaler_path)
+                if _read_model_summary(model_path) is None:
+                    _write_model_summary(model_path, model, versions[0])
+                if _FEATURE_DTYPE != 'float64':
+                    _cast_scaler(scaler)
+                cached = _MODEL_CACHE[model_name] = (versions, model, scaler)
+        
+        return cached[1], cached[2]
     
     except Exception as e:
         return None, None, str(e)
@@ -35,6 +137,8 @@ def load_model(model_name='enhanced_astrological_model'):
 def make_prediction(features, model_name='enhanced_astrological_model'):
     """Make a prediction using the trained model"""
     try:
+        import numpy as np
+        
         # Load model and scaler
         model, scaler = load_model(model_name)
         
@@ -44,15 +148,18 @@ def make_prediction(features, model_name='enhanced_astrological_model'):
                 'error': 'Failed to load model or scaler'
             }
         
-        # Convert features to numpy array
-        features_array = np.array(features).reshape(1, -1)
-        
-        # Scale features
-        features_scaled = scaler.transform(features_array)
+        # Copy features into a fresh row so scaling in place never touches the caller's data
+        features_array = np.array(features, dtype=_FEATURE_DTYPE).reshape(1, -1)
+        features_scaled = _scale_in_place(scaler, features_array)
         
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        probabilities = model.predict_proba(features_scaled)[0].tolist()
+        # Make prediction, deriving the class from the probabilities when possible
+        if hasattr(model, 'predict_proba'):
+            row_probabilities = model.predict_proba(features_scaled)[0]
+            prediction = model.classes_[np.argmax(row_probabilities)]
+            probabilities = row_probabilities.tolist()
+        else:
+            prediction = model.predict(features_scaled)[0]
+            probabilities = None
         
         # Get feature importance if available
         feature_importance = None
@@ -63,7 +170,7 @@ def make_prediction(features, model_name='enhanced_astrological_model'):
             'success': True,
             'prediction': int(prediction),
             'probabilities': probabilities,
-            'confidence': max(probabilities),
+            'confidence': max(probabilities) if probabilities else None,
             'feature_importance': feature_importance,
             'model_used': model_name,
             'features_processed': len(features)
@@ -75,9 +182,104 @@ def make_prediction(features, model_name='enhanced_astrological_model'):
             'error': str(e)
         }
 
+def predict_many(rows, model_name='enhanced_astrological_model'):
+    """Make predictions for a batch of feature vectors in one model call"""
+    if len(rows) == 0:
+        return {
+            'success': False,
+            'error': 'At least one feature row is required'
+        }
+    
+    try:
+        import numpy as np
+        
+        # Load model and scaler
+        model, scaler = load_model(model_name)
+        
+        if model is None or scaler is None:
+            return {
+                'success': False,
+                'error': 'Failed to load model or scaler'
+            }
+        
+        # Stack all rows into a single (K, n_features) array
+        features_array = np.asarray(rows, dtype=_FEATURE_DTYPE)
+        if features_array.ndim != 2:
+            raise ValueError('Batch features must be a list of feature lists')
+        
+        # Scale and predict the whole batch at once
+        features_scaled = scaler.transform(features_array)
+        if hasattr(model, 'predict_proba'):
+            probabilities = model.predict_proba(features_scaled)
+            predictions = model.classes_[np.argmax(probabilities, axis=1)]
+            probabilities = probabilities.tolist()
+        else:
+            predictions = model.predict(features_scaled)
+            probabilities = [None] * len(predictions)
+        
+        feature_importance = None
+        if hasattr(model, 'feature_importances_'):
+            feature_importance = model.feature_importances_.tolist()
+        
+        results = []
+        for prediction, row_probabilities in zip(predictions, probabilities):
+            results.append({
+                'prediction': int(prediction),
+                'probabilities': row_probabilities,
+                'confidence': max(row_probabilities) if row_probabilities else None
+            })
+        
+        return {
+            'success': True,
+            'predictions': results,
+            'feature_importance': feature_importance,
+            'model_used': model_name,
+            'rows_processed': len(results)
+        }
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+# Feature column order expected by the trained model
+_FEATURE_COUNT = 15
+_FLAG_COLUMNS = (
+    (3, 'is_aspect_pattern'),
+    (4, 'is_planetary_pattern')
+)
+# Planet flags occupy the contiguous columns 8..14
+_PLANET_KEYS = ('has_mars', 'has_jupiter', 'has_saturn', 'has_rahu', 'has_ketu', 'has_sun', 'has_moon')
+
+def _featurize(patterns):
+    """Convert a list of pattern dicts into a (K, 15) feature matrix"""
+    import numpy as np
+    
+    out = np.zeros((len(patterns), _FEATURE_COUNT), dtype=_FEATURE_DTYPE)
+    
+    # Fill raw columns once per key, then derive the rest as vector ops;
+    # float() rejects nulls that numpy would otherwise store as NaN
+    out[:, 0] = [float(p.get('success_rate', 0)) for p in patterns]
+    out[:, 1] = [float(p.get('occurrences', 0)) for p in patterns]
+    out[:, 5] = [float(p.get('name_length', 0)) for p in patterns]
+    out[:, 7] = [float(p.get('score', 0)) for p in patterns]
+    for column, key in _FLAG_COLUMNS:
+        out[:, column] = [bool(p.get(key)) for p in patterns]
+    out[:, 8:15] = np.array(
+        [[bool(p.get(key)) for key in _PLANET_KEYS] for p in patterns],
+        dtype=_FEATURE_DTYPE
+    ).reshape(len(patterns), len(_PLANET_KEYS))
+    
+    out[:, 2] = np.log(out[:, 1] + 1)
+    out[:, 6] = out[:, 0] / 100
+    out[:, 7] /= 1000
+    
+    return out
+
 def predict_astrological_pattern_success(pattern_data):
     """
-    Predict if an astrological pattern will be successful
+    Predict if an astrological pattern (or a list of patterns) will be successful
     Expected pattern_data format:
     {
         'success_rate': float,
@@ -96,26 +298,16 @@ def predict_astrological_pattern_success(pattern_data):
     }
     """
     try:
-        # Convert pattern data to feature vector
-        features = [
-            pattern_data.get('success_rate', 0),
-            pattern_data.get('occurrences', 0),
-            np.log(pattern_data.get('occurrences', 0) + 1),
-            1 if pattern_data.get('is_aspect_pattern', False) else 0,
-            1 if pattern_data.get('is_planetary_pattern', False) else 0,
-            pattern_data.get('name_length', 0),
-            pattern_data.get('success_rate', 0) / 100,
-            pattern_data.get('score', 0) / 1000,
-            1 if pattern_data.get('has_mars', False) else 0,
-            1 if pattern_data.get('has_jupiter', False) else 0,
-            1 if pattern_data.get('has_saturn', False) else 0,
-            1 if pattern_data.get('has_rahu', False) else 0,
-            1 if pattern_data.get('has_ketu', False) else 0,
-            1 if pattern_data.get('has_sun', False) else 0,
-            1 if pattern_data.get('has_moon', False) else 0
-        ]
-        
-        return make_prediction(features)
+        # A list of patterns is predicted as one batch
+        if isinstance(pattern_data, list):
+            if not pattern_data:
+                return {
+                    'success': False,
+                    'error': 'Pattern data list is empty'
+                }
+            return predict_many(_featurize(pattern_data))
+        
+        return make_prediction(_featurize([pattern_data])[0])
         
     except Exception as e:
         return {
@@ -135,27 +327,30 @@ def get_model_info():
                 # Get file stats
                 stats = model_file.stat()
                 
-                # Try to load and get basic info
+                # Prefer the cached summary; otherwise load the model once and cache its summary
                 if 'scaler' not in model_file.name:
-                    try:
-                        model = joblib.load(model_file)
-                        model_info = {
-                            'filename': model_file.name,
-                            'size': stats.st_size,
-                            'modified': stats.st_mtime,
-                            'type': type(model).__name__,
-                            'has_feature_importance': hasattr(model, 'feature_importances_'),
-                            'has_predict_proba': hasattr(model, 'predict_proba')
-                        }
-                        models.append(model_info)
-                    except:
-                        models.append({
-                            'filename': model_file.name,
-                            'size': stats.st_size,
-                            'modified': stats.st_mtime,
-                            'type': 'unknown',
-                            'error': 'Could not load model'
-                        })
+                    model_info = {
+                        'filename': model_file.name,
+                        'size': stats.st_size,
+                        'modified': stats.st_mtime
+                    }
+                    
+                    summary = _read_model_summary(model_file)
+                    if summary is None:
+                        try:
+                            import joblib
+                            model = joblib.load(model_file)
+                            summary = _model_summary(model)
+                            _write_model_summary(model_file, model, (stats.st_mtime_ns, stats.st_size))
+                        except:
+                            model_info.update({
+                                'type': 'unknown',
+                                'error': 'Could not load model'
+                            })
+                    
+                    if summary is not None:
+                        model_info.update(summary)
+                    models.append(model_info)
             except Exception as e:
                 models.append({
                     'filename': model_file.name,
@@ -174,12 +369,95 @@ def get_model_info():
             'error': str(e)
         }
 
+def _is_batch(features):
+    """A list of feature lists is treated as a batch request"""
+    return isinstance(features, list) and len(features) > 0 and isinstance(features[0], list)
+
+def handle_request(request):
+    """
+    Dispatch a single worker request
+    Expected request format:
+    {
+        'command': 'predict' | 'pattern-predict' | 'model-info',
+        'features': list,        # predict
+        'model_name': str,       # predict (optional)
+        'pattern_data': dict | list  # pattern-predict (a list is predicted as a batch)
+    }
+    """
+    if not isinstance(request, dict):
+        return {
+            'success': False,
+            'error': 'Request must be a JSON object'
+        }
+    
+    command = request.get('command')
+    
+    if command == 'predict':
+        if 'features' not in request:
+            return {
+                'success': False,
+                'error': 'Features required for prediction'
+            }
+        features = request['features']
+        model_name = request.get('model_name', 'enhanced_astrological_model')
+        if _is_batch(features):
+            return predict_many(features, model_name)
+        return make_prediction(features, model_name)
+    
+    if command == 'pattern-predict':
+        if 'pattern_data' not in request:
+            return {
+                'success': False,
+                'error': 'Pattern data required for prediction'
+            }
+        return predict_astrological_pattern_success(request['pattern_data'])
+    
+    if command == 'model-info':
+        return get_model_info()
+    
+    return {
+        'success': False,
+        'error': f'Unknown command: {command}. Use: predict, pattern-predict, or model-info'
+    }
+
+def serve():
+    """
+    Run as a persistent worker: read one JSON request per line from stdin
+    and write one JSON response per line to stdout. Keeps the interpreter
+    and loaded models warm between predictions.
+    """
+    # Read raw bytes so a malformed line is reported instead of ending the worker
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            result = handle_request(_loads(line.decode('utf-8')))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            result = {
+                'success': False,
+                'error': 'Invalid JSON request'
+            }
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': str(e)
+            }
+        
+        if orjson is not None:
+            sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+            sys.stdout.buffer.flush()
+        else:
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+
 def main():
     """Main function to handle command line arguments"""
     if len(sys.argv) < 2:
-        print(json.dumps({
+        print(_dumps({
             'success': False,
-            'error': 'No command provided. Use: predict, pattern-predict, or model-info'
+            'error': 'No command provided. Use: predict, pattern-predict, model-info, or serve'
         }))
         sys.exit(1)
     
@@ -187,7 +465,7 @@ def main():
     
     if command == 'predict':
         if len(sys.argv) < 3:
-            print(json.dumps({
+            print(_dumps({
                 'success': False,
                 'error': 'Features required for prediction'
             }))
@@ -195,42 +473,48 @@ def main():
         
         # Parse features from command line
         try:
-            features = json.loads(sys.argv[2])
+            features = _loads(sys.argv[2])
             model_name = sys.argv[3] if len(sys.argv) > 3 else 'enhanced_astrological_model'
-            result = make_prediction(features, model_name)
-            print(json.dumps(result))
+            if _is_batch(features):
+                result = predict_many(features, model_name)
+            else:
+                result = make_prediction(features, model_name)
+            print(_dumps(result))
         except json.JSONDecodeError:
-            print(json.dumps({
+            print(_dumps({
                 'success': False,
                 'error': 'Invalid JSON format for features'
             }))
     
     elif command == 'pattern-predict':
         if len(sys.argv) < 3:
-            print(json.dumps({
+            print(_dumps({
                 'success': False,
                 'error': 'Pattern data required for prediction'
             }))
             sys.exit(1)
         
         try:
-            pattern_data = json.loads(sys.argv[2])
+            pattern_data = _loads(sys.argv[2])
             result = predict_astrological_pattern_success(pattern_data)
-            print(json.dumps(result))
+            print(_dumps(result))
         except json.JSONDecodeError:
-            print(json.dumps({
+            print(_dumps({
                 'success': False,
                 'error': 'Invalid JSON format for pattern data'
             }))
     
     elif command == 'model-info':
         result = get_model_info()
-        print(json.dumps(result))
+        print(_dumps(result))
+    
+    elif command == 'serve':
+        serve()
     
     else:
-        print(json.dumps({
+        print(_dumps({
             'success': False,
-            'error': f'Unknown command: {command}. Use: predict, pattern-predict, or model-info'
+            'error': f'Unknown command: {command}. Use: predict, pattern-predict, model-info, or serve'
         }))
 
 if __name__ == "__main__":